@@ -6,104 +6,133 @@ import sqlite3
 import datetime
 import json
 import os
-from pathlib import Path
+import shutil
+import threading
+import atexit
+from collections import deque
+from functools import lru_cache
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
 # Get model and host from environment
-OLLAMA_MODEL = os.getenv('OLLAMA_MODEL', 'llama3.2:1b')
+OLLAMA_MODEL = os.getenv('OLLAMA_MODEL', 'llama3.2:1b-instruct-q4_K_M')
 OLLAMA_HOST = os.getenv('OLLAMA_HOST', 'http://localhost:11434')
+OLLAMA_KEEP_ALIVE = os.getenv('OLLAMA_KEEP_ALIVE', '24h')
 
-# Configure Ollama client
-import ollama
+# Configure Ollama client - one module-level client so every planner call
+# reuses the same pooled HTTP connection
 ollama_client = ollama.Client(host=OLLAMA_HOST)
 
+# Planner output is a short JSON document, cap decode length accordingly.
+# num_ctx leaves room for the prompt plus the annotated directory listing.
+PLANNER_OPTIONS = {'num_predict': 256, 'temperature': 0, 'num_ctx': 2048}
+
+def warm_model() -> bool:
+    """Load the planner model into memory so the first plan() skips the cold load"""
+    try:
+        ollama_client.generate(model=OLLAMA_MODEL, keep_alive=OLLAMA_KEEP_ALIVE)
+        return True
+    except Exception:
+        return False
+
 # Plan schema - single source of truth
 PLAN_SCHEMA = {
     "read_text_file": {"requires_target": True},
     "describe_binary_file": {"requires_target": True},
-    "search_text": {"requires_target": True},
+    "search_text": {"requires_target": True, "requires_pattern": True, "max_results": (20, 50)},
     "list_dir": {"requires_target": False}, 
     "pwd": {"requires_target": False},
     "whoami": {"requires_target": False}
 }
 
-BINARY_EXTENSIONS = {'.db', '.sqlite', '.bin', '.exe', '.so', '.dylib', '.dll', '.jpg', '.png', '.gif', '.pdf', '.zip', '.tar', '.gz'}
-TEXT_EXTENSIONS = {'.md', '.txt', '.py', '.toml', '.json', '.yaml', '.yml', '.lock', '.gitignore', '.env'}
+# JSON schema passed to Ollama's structured outputs - decoding is constrained
+# to this shape, so the planner cannot emit malformed JSON
+PLAN_JSON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "steps": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "action": {"type": "string", "enum": list(PLAN_SCHEMA)},
+                    "target": {"type": "string"},
+                    "pattern": {"type": "string"},
+                    "max_results": {"type": "integer"}
+                },
+                "required": ["action"]
+            }
+        }
+    },
+    "required": ["steps"]
+}
+
+# Deterministic plans for fixed tasks (run_full_audit) - these skip the LLM planner
+TASK_TEMPLATES = {
+    "List all Python files and directories": [{"action": "list_dir"}],
+    "Find TODO comments": [{"action": "search_text", "pattern": "TODO", "target": ".", "max_results": 20}],
+    "Find FIXME comments": [{"action": "search_text", "pattern": "FIXME", "target": ".", "max_results": 20}],
+    "Find import statements": [{"action": "search_text", "pattern": "import", "target": ".", "max_results": 20}],
+    "Find configuration files like .env, config.json": [{"action": "search_text", "pattern": "config", "target": ".", "max_results": 20}]
+}
+
+BINARY_EXTENSIONS = frozenset({'.db', '.sqlite', '.bin', '.exe', '.so', '.dylib', '.dll', '.jpg', '.png', '.gif', '.pdf', '.zip', '.tar', '.gz'})
+TEXT_EXTENSIONS = frozenset({'.md', '.txt', '.py', '.toml', '.json', '.yaml', '.yml', '.lock', '.gitignore', '.env'})
+# SQLite journal files sit next to the database (agent_memory.db-wal, ...)
+BINARY_SUFFIXES = tuple(db + journal for db in ('.db', '.sqlite') for journal in ('-wal', '-shm', '-journal'))
 
 def classify_file_type(filename: str) -> str:
     """Classify file as text or binary based on extension"""
-    if '.' not in filename:
-        return 'text'  # Default for files without extension
+    if filename.lower().endswith(BINARY_SUFFIXES):
+        return 'binary'
     
-    ext = '.' + filename.split('.')[-1].lower()
+    i = filename.rfind('.')
+    if i < 0:
+        return 'text'  # Default for files without extension
     
-    if ext in BINARY_EXTENSIONS:
-        return 'binary'
-    elif ext in TEXT_EXTENSIONS:
-        return 'text'
-    else:
-        return 'text'  # Default to text for unknown extensions
+    # Anything not known to be binary (text or unknown extension) is text
+    return 'binary' if filename[i:].lower() in BINARY_EXTENSIONS else 'text'
 
-def annotate_environment_facts(raw_facts: str) -> str:
-    """Add file type annotations to environment facts"""
-    lines = raw_facts.split('\n')
-    annotated = []
-    
-    for line in lines:
-        if line.strip() and not line.startswith('total') and not line.startswith('drwx'):
-            # Extract filename from ls -la output
-            parts = line.split()
-            if len(parts) >= 9:
-                filename = parts[-1]
-                if not filename.startswith('.') or filename in ['.gitignore', '.python-version']:
-                    file_type = classify_file_type(filename)
-                    line += f" [{file_type}]"
-        annotated.append(line)
-    
-    return '\n'.join(annotated)
+# Validation lookup tables, derived once from PLAN_SCHEMA
+PLAN_REQUIRED_FIELDS = {
+    action: ("action",)
+            + (("target",) if spec["requires_target"] else ())
+            + (("pattern",) if spec.get("requires_pattern") else ())
+    for action, spec in PLAN_SCHEMA.items()
+}
+PLAN_RESULT_LIMITS = {action: spec["max_results"] for action, spec in PLAN_SCHEMA.items() if "max_results" in spec}
 
 def validate_plan(plan_json: str) -> dict:
     """Validate and parse plan JSON"""
     try:
         plan = json.loads(plan_json)
-        
-        # Check required structure
-        if not isinstance(plan, dict) or "steps" not in plan:
+    except json.JSONDecodeError:
+        return None
+    
+    # Check required structure
+    if not isinstance(plan, dict) or not isinstance(plan.get("steps"), list):
+        return None
+    
+    # Validate each step with one table lookup for its action
+    for step in plan["steps"]:
+        if not isinstance(step, dict):
             return None
-            
-        if not isinstance(plan["steps"], list):
+        
+        required = PLAN_REQUIRED_FIELDS.get(step.get("action"))
+        if required is None or not all(field in step for field in required):
             return None
-            
-        # Validate each step
-        for step in plan["steps"]:
-            if not isinstance(step, dict) or "action" not in step:
-                return None
-                
-            action = step["action"]
-            if action not in PLAN_SCHEMA:
-                return None
-                
-            # Check if target is required
-            if PLAN_SCHEMA[action]["requires_target"] and "target" not in step:
-                return None
-                
-            # Validate search_text specific fields
-            if action == "search_text":
-                if "pattern" not in step:
-                    return None
-                # Ensure max_results is reasonable
-                if "max_results" in step and step["max_results"] > 50:
-                    step["max_results"] = 50
-                elif "max_results" not in step:
-                    step["max_results"] = 20
-                
-        return plan
         
-    except json.JSONDecodeError:
-        return None
+        # Ensure max_results is reasonable (default, ceiling)
+        limits = PLAN_RESULT_LIMITS.get(step["action"])
+        if limits:
+            default, ceiling = limits
+            step["max_results"] = min(step.get("max_results", default), ceiling)
+    
+    return plan
 
 class AgentState(TypedDict):
     task: str
@@ -119,20 +148,69 @@ class AgentState(TypedDict):
     failure_count: int
     system_prompt: str
 
+# Memory database - one connection for the whole process. WAL with
+# synchronous=NORMAL avoids an fsync per insert; the lock serializes
+# access from concurrent audits.
+MEMORY_DB = os.getenv('MEMORY_DB', 'agent_memory.db')
+_memory_conn = sqlite3.connect(MEMORY_DB, check_same_thread=False, isolation_level=None)
+_memory_conn.execute('PRAGMA journal_mode=WAL')
+_memory_conn.execute('PRAGMA synchronous=NORMAL')
+_memory_conn.execute('PRAGMA temp_store=MEMORY')
+_memory_lock = threading.Lock()
+
 # Initialize memory database
 def init_memory():
-    conn = sqlite3.connect('agent_memory.db')
-    conn.execute('''CREATE TABLE IF NOT EXISTS memories 
-                    (id INTEGER PRIMARY KEY, timestamp TEXT, content TEXT)''')
-    conn.commit()
-    conn.close()
+    with _memory_lock:
+        _memory_conn.execute('''CREATE TABLE IF NOT EXISTS memories 
+                                (id INTEGER PRIMARY KEY, timestamp TEXT, content TEXT)''')
+        _memory_conn.execute('CREATE INDEX IF NOT EXISTS idx_memories_timestamp ON memories(timestamp DESC)')
+
+# Memories are buffered and written in batches, one transaction per flush
+MEMORY_FLUSH_EVERY = 8
+_pending_memories = deque()
+
+def _flush_pending_memories():
+    """Write buffered memories; the caller must hold _memory_lock"""
+    if not _pending_memories:
+        return
+    
+    rows = list(_pending_memories)
+    _pending_memories.clear()
+    _memory_conn.execute('BEGIN')
+    try:
+        _memory_conn.executemany("INSERT INTO memories (timestamp, content) VALUES (?, ?)", rows)
+        _memory_conn.execute('COMMIT')
+    except sqlite3.Error:
+        _memory_conn.execute('ROLLBACK')
+        raise
+
+def flush_memory():
+    """Write any buffered memories to the database"""
+    with _memory_lock:
+        _flush_pending_memories()
+
+_memory_closed = False
+
+def close_memory():
+    """Flush buffered memories, checkpoint the WAL and close the database (removes -wal/-shm)"""
+    global _memory_closed
+    with _memory_lock:
+        if _memory_closed:
+            return
+        _flush_pending_memories()
+        _memory_conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        _memory_conn.close()
+        _memory_closed = True
+
+# Buffered memories must not be lost when the process exits
+atexit.register(close_memory)
 
 def save_memory(content: str):
-    conn = sqlite3.connect('agent_memory.db')
     timestamp = datetime.datetime.now().isoformat()
-    conn.execute("INSERT INTO memories (timestamp, content) VALUES (?, ?)", (timestamp, content))
-    conn.commit()
-    conn.close()
+    with _memory_lock:
+        _pending_memories.append((timestamp, content))
+        if len(_pending_memories) >= MEMORY_FLUSH_EVERY:
+            _flush_pending_memories()
 
 def save_smart_memory(task: str, result: str, success: bool):
     # Only save meaningful experiences
@@ -142,15 +220,17 @@ def save_smart_memory(task: str, result: str, success: bool):
         save_memory(memory)
 
 def recall_smart_memory(task: str) -> str:
-    conn = sqlite3.connect('agent_memory.db')
     # Look for similar tasks or failures
-    cursor = conn.execute("""
-        SELECT content FROM memories 
-        WHERE content LIKE ? OR content LIKE ? OR content LIKE ?
-        ORDER BY timestamp DESC LIMIT 2
-    """, (f"%{task}%", f"%FAILED%", f"%{task.split(':')[0] if ':' in task else task}%"))
-    memories = [row[0] for row in cursor.fetchall()]
-    conn.close()
+    with _memory_lock:
+        # Recall must see memories that are still buffered
+        _flush_pending_memories()
+        
+        cursor = _memory_conn.execute("""
+            SELECT content FROM memories 
+            WHERE content LIKE ? OR content LIKE ? OR content LIKE ?
+            ORDER BY timestamp DESC LIMIT 2
+        """, (f"%{task}%", f"%FAILED%", f"%{task.split(':')[0] if ':' in task else task}%"))
+        memories = [row[0] for row in cursor.fetchall()]
     
     if memories:
         return f"Past experience: {' | '.join(memories)}"
@@ -159,75 +239,43 @@ def recall_smart_memory(task: str) -> str:
 def ground(state: AgentState) -> AgentState:
     print("🌍 Grounding...")
     
-    # Gather environment facts
+    # Gather environment facts in-process, each entry annotated with its type
     try:
-        pwd_result = subprocess.run("pwd", shell=True, capture_output=True, text=True, timeout=5)
-        ls_result = subprocess.run("ls -la", shell=True, capture_output=True, text=True, timeout=5)
+        with os.scandir('.') as it:
+            entries = sorted((entry.name, entry.is_dir()) for entry in it)
         
-        raw_facts = f"Current directory: {pwd_result.stdout.strip()}\nContents: {ls_result.stdout.strip()}"
-        state["environment_facts"] = annotate_environment_facts(raw_facts)
-    except:
+        contents = "\n".join(
+            f"{name}/ [dir]" if is_dir else f"{name} [{classify_file_type(name)}]"
+            for name, is_dir in entries
+        )
+        state["environment_facts"] = f"Current directory: {os.getcwd()}\nContents:\n{contents}"
+    except OSError:
         state["environment_facts"] = "Environment inspection failed"
     
     return state
 
+@lru_cache(maxsize=16)
 def load_system_prompt(mode: str = "default") -> str:
-    """Load system prompt based on mode"""
-    prompt_file = f"prompts/{mode}.txt"
-    if Path(prompt_file).exists():
-        with open(prompt_file) as f:
+    """Load system prompt based on mode (cached; call load_system_prompt.cache_clear() after editing prompts)"""
+    try:
+        with open(f"prompts/{mode}.txt") as f:
             return f.read().strip()
-    else:
+    except FileNotFoundError:
         return "You are a helpful autonomous agent."
 
-def plan(state: AgentState) -> AgentState:
-    print("📋 Planning...")
-    
-    if not state["plan"]:
-        # Get system prompt from state or use default
-        system_prompt = state.get("system_prompt", "")
-        
-        # Create specialization overlay (short and focused)
-        specialization_overlay = ""
-        if "Codebase Auditor" in system_prompt:
-            specialization_overlay = """
-SPECIALIZATION CONTEXT:
-You are operating in Codebase Auditor mode.
-Your goal is to audit a source code repository.
-Prefer search_text for TODO, FIXME, import, and config patterns.
-"""
-        elif "Config Inspector" in system_prompt:
-            specialization_overlay = """
-SPECIALIZATION CONTEXT:
-You are operating in Config Inspector mode.
-Your goal is to inspect configuration files and settings.
-Prefer search_text for .env, config.json, DEBUG, localhost, and dev patterns.
-"""
-        elif "Repo Hygiene Agent" in system_prompt:
-            specialization_overlay = """
-SPECIALIZATION CONTEXT:
-You are operating in Repo Hygiene mode.
-Your goal is to inspect repository quality and organization.
-Prefer search_text for README, LICENSE, .log, TODO, and artifact patterns.
-"""
-
-        prompt = f"""{specialization_overlay}
-
-Task: {state['task']}
-Environment: {state['environment_facts']}
-
-You MUST output ONLY valid JSON.
+# Planner instructions - identical on every call so the model server can
+# reuse the prompt prefix (KV cache) instead of re-processing it
+PLANNER_RULES = """You MUST output ONLY valid JSON.
 Do NOT include explanations.
 Do NOT include markdown.
 Do NOT include backticks.
-If unsure, output an empty JSON object {{}}.
 
 MANDATORY RULE: If the user request includes words like "find", "search", "locate", "count", or "where", you MUST use the search_text action.
 Do NOT use read_text_file for searching when search_text is available.
 
 Example:
 User: Find import statements in Python files
-Required plan: {{"steps": [{{"action": "search_text", "pattern": "import", "target": ".", "max_results": 20}}]}}
+Required plan: {"steps": [{"action": "search_text", "pattern": "import", "target": ".", "max_results": 20}]}
 
 Valid actions:
 - search_text: find plain text in files (pattern: plain string, target: directory/file, max_results: number ≤50)
@@ -236,28 +284,103 @@ Valid actions:
 - list_dir: list directory contents
 - pwd: show current directory
 
-Use ONLY files that exist in the environment above.
+Use ONLY files that exist in the environment given with the task.
 For search_text: use plain strings only, no regex.
 Output ONLY the JSON."""
 
-        for attempt in range(2):
-            try:
-                response = ollama_client.chat(model=OLLAMA_MODEL, messages=[
-                    {'role': 'user', 'content': prompt}
-                ])
+# Specialization overlays (short and focused), keyed by a marker in the mode's system prompt
+SPECIALIZATION_OVERLAYS = (
+    ("Codebase Auditor", """SPECIALIZATION CONTEXT:
+You are operating in Codebase Auditor mode.
+Your goal is to audit a source code repository.
+Prefer search_text for TODO, FIXME, import, and config patterns.
+"""),
+    ("Config Inspector", """SPECIALIZATION CONTEXT:
+You are operating in Config Inspector mode.
+Your goal is to inspect configuration files and settings.
+Prefer search_text for .env, config.json, DEBUG, localhost, and dev patterns.
+"""),
+    ("Repo Hygiene Agent", """SPECIALIZATION CONTEXT:
+You are operating in Repo Hygiene mode.
+Your goal is to inspect repository quality and organization.
+Prefer search_text for README, LICENSE, .log, TODO, and artifact patterns.
+"""),
+)
+
+def planner_system_prompt(system_prompt: str) -> str:
+    """Select the static planner system message for the agent's mode"""
+    for marker, overlay in SPECIALIZATION_OVERLAYS:
+        if marker in system_prompt:
+            return overlay + "\n" + PLANNER_RULES
+    return PLANNER_RULES
+
+def chat_plan_json(messages: list) -> str:
+    """Stream a plan from the model and stop as soon as the top-level JSON object closes"""
+    stream = ollama_client.chat(model=OLLAMA_MODEL, messages=messages, format=PLAN_JSON_SCHEMA, stream=True,
+                                keep_alive=OLLAMA_KEEP_ALIVE, options=PLANNER_OPTIONS)
+    parts = []
+    depth = 0
+    in_string = False
+    escaped = False
+    try:
+        for chunk in stream:
+            text = chunk['message']['content']
+            for i, ch in enumerate(text):
+                # Braces inside JSON strings do not count
+                if in_string:
+                    if escaped:
+                        escaped = False
+                    elif ch == '\\':
+                        escaped = True
+                    elif ch == '"':
+                        in_string = False
+                elif ch == '"':
+                    in_string = True
+                elif ch == '{':
+                    depth += 1
+                elif ch == '}' and depth > 0:
+                    depth -= 1
+                    if depth == 0:
+                        parts.append(text[:i + 1])
+                        return ''.join(parts)
+            parts.append(text)
+    finally:
+        # Closing the stream closes the HTTP response, which stops generation
+        stream.close()
+    
+    return ''.join(parts)
+
+def plan(state: AgentState) -> AgentState:
+    print("📋 Planning...")
+    
+    if not state["plan"]:
+        # Known tasks have a fixed plan, no need to ask the model
+        template = TASK_TEMPLATES.get(state["task"])
+        if template:
+            state["plan"] = [dict(step) for step in template]
+            state["current_step"] = 0
+            return state
+        
+        # Static instructions go in the system message so Ollama can reuse the
+        # cached prefix across calls; only task and environment vary per call
+        messages = [
+            {'role': 'system', 'content': planner_system_prompt(state.get("system_prompt", ""))},
+            {'role': 'user', 'content': f"Task: {state['task']}\nEnvironment: {state['environment_facts']}"}
+        ]
+
+        try:
+            # Still validated: the schema fixes the shape, not target/pattern semantics
+            plan = validate_plan(chat_plan_json(messages).strip())
+            if plan:
+                state["plan"] = plan["steps"]
+                state["current_step"] = 0
+            else:
+                print("❌ Invalid plan format")
                 
-                plan = validate_plan(response['message']['content'].strip())
-                if plan:
-                    state["plan"] = plan["steps"]
-                    state["current_step"] = 0
-                    break
-                else:
-                    print(f"❌ Invalid plan format, attempt {attempt + 1}")
-                    
-            except Exception as e:
-                print(f"❌ Plan generation failed: {e}")
+        except Exception as e:
+            print(f"❌ Plan generation failed: {e}")
         
-        # Fallback if all attempts fail
+        # Fallback if planning fails
         if not state["plan"]:
             state["plan"] = [
                 {"action": "list_dir"},
@@ -268,6 +391,16 @@ Output ONLY the JSON."""
     
     return state
 
+# Tool request builders per plan action, each takes (step, target)
+STEP_REQUESTS = {
+    "read_text_file": lambda step, target: f"read_text:{target}",
+    "describe_binary_file": lambda step, target: f"describe_binary:{target}",
+    "search_text": lambda step, target: f"search_text:{step.get('pattern', '')}:{target}:{step.get('max_results', 20)}",
+    "list_dir": lambda step, target: f"ls {target}" if target else "ls",
+    "pwd": lambda step, target: "pwd",
+    "whoami": lambda step, target: "whoami",
+}
+
 def execute_step(state: AgentState) -> AgentState:
     print(f"⚙️ Executing step {state['current_step']+1}...")
     
@@ -277,27 +410,9 @@ def execute_step(state: AgentState) -> AgentState:
         action = step["action"]
         target = step.get("target", "")
         
-        # Convert to tool request format
-        if action == "read_text_file":
-            state["tool_request"] = f"read_text:{target}"
-        elif action == "describe_binary_file":
-            state["tool_request"] = f"describe_binary:{target}"
-        elif action == "search_text":
-            pattern = step.get("pattern", "")
-            max_results = step.get("max_results", 20)
-            state["tool_request"] = f"search_text:{pattern}:{target}:{max_results}"
-        elif action == "list_dir":
-            if target:
-                state["tool_request"] = f"ls {target}"
-            else:
-                state["tool_request"] = "ls"
-        elif action == "pwd":
-            state["tool_request"] = "pwd"
-        elif action == "whoami":
-            state["tool_request"] = "whoami"
-        else:
-            state["tool_request"] = "ls"  # Safe fallback
-            
+        # Convert to tool request format, ls is the safe fallback
+        build_request = STEP_REQUESTS.get(action)
+        state["tool_request"] = build_request(step, target) if build_request else "ls"
         state["thought"] = f"Executing: {action} {target}".strip()
     else:
         state["thought"] = "Plan completed"
@@ -320,11 +435,124 @@ def parse_tool_request(raw_request: str) -> str:
     # Fallback to safe default
     return 'ls'
 
+# Directories never worth searching (dot-directories are skipped as well)
+SKIP_DIRS = frozenset({'node_modules', '__pycache__'})
+
+def iter_text_files(path: str):
+    """Yield DirEntry objects for text files under path, files before subdirectories"""
+    subdirs = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                # DirEntry caches the stat from the directory read, no extra syscalls
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith('.') and entry.name not in SKIP_DIRS:
+                        subdirs.append(entry.path)
+                elif entry.is_file() and classify_file_type(entry.name) == 'text':
+                    yield entry
+    except OSError:
+        return
+    
+    for subdir in subdirs:
+        yield from iter_text_files(subdir)
+
+def search_with_ripgrep(pattern: str, path: str, max_results: int):
+    """Fixed-string, case-insensitive search via ripgrep; None if rg is unavailable"""
+    rg = shutil.which('rg')
+    if not rg:
+        return None
+    
+    # Explicit file paths bypass rg's glob filters, binaries are never searched
+    if os.path.isfile(path) and classify_file_type(path) == 'binary':
+        return []
+    
+    # rg folds case by Unicode rules where search_file folds ASCII only, so a
+    # pattern with non-ASCII letters (e.g. "É") can match more lines here
+    cmd = [rg, '--fixed-strings', '--ignore-case', '--line-number', '--with-filename',
+           '--no-heading', '--null', '--color', 'never', '--sort', 'path',
+           '--max-count', str(max_results), '--max-filesize', str(MAX_SEARCH_FILE_SIZE),
+           # Mirror iter_text_files: dotfiles such as .env are searched and
+           # .gitignore is not honoured, dot-directories and SKIP_DIRS are skipped
+           '--hidden', '--no-ignore', '-g', '!.*/']
+    for name in sorted(SKIP_DIRS):
+        cmd.extend(['-g', f'!{name}/'])
+    for ext in sorted(BINARY_EXTENSIONS) + list(BINARY_SUFFIXES):
+        cmd.extend(['-g', f'!*{ext}'])
+    cmd.extend(['--', pattern, path])
+    
+    try:
+        proc = subprocess.run(cmd, capture_output=True, encoding='utf-8', errors='ignore', timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    
+    # 0 = matches, 1 = no matches, anything else is an rg error
+    if proc.returncode not in (0, 1):
+        return None
+    
+    results = []
+    for line in proc.stdout.split('\n'):
+        if not line:
+            continue
+        file_path, _, rest = line.partition('\0')
+        line_num, _, text = rest.partition(':')
+        results.append(f"{file_path}:{line_num}:{text.strip()[:100]}")
+        if len(results) >= max_results:
+            break
+    return results
+
+# Larger files are skipped by the Python search path
+MAX_SEARCH_FILE_SIZE = 10 * 1024 * 1024
+SEARCH_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+# Files are scanned in newline-aligned chunks of about this size, so a worker
+# holds one chunk and its lowercased copy rather than the whole file
+SEARCH_CHUNK_SIZE = 1024 * 1024
+
+def search_file(file_path: str, needle: bytes, max_results: int) -> list:
+    """Case-insensitive (ASCII) search of one file for a lowercased needle, only matching lines are decoded"""
+    size = os.stat(file_path).st_size
+    if size == 0 or size > MAX_SEARCH_FILE_SIZE:
+        return []
+    
+    results = []
+    append = results.append
+    line_num = 1  # line number of the first line in the current chunk
+    with open(file_path, 'rb') as f:
+        while len(results) < max_results:
+            data = f.read(SEARCH_CHUNK_SIZE)
+            if not data:
+                break
+            if not data.endswith(b'\n'):
+                data += f.readline()  # finish the last line, no match spans two chunks
+            
+            # Needles without letters match the raw bytes, no lowercased copy needed
+            haystack = data.lower() if needle.upper() != needle else data
+            chunk_line = line_num
+            pos = 0
+            while len(results) < max_results:
+                hit = haystack.find(needle, pos)
+                if hit < 0:
+                    break
+                
+                start = data.rfind(b'\n', pos, hit) + 1 or pos
+                end = data.find(b'\n', hit + len(needle))
+                if end < 0:
+                    end = len(data)
+                
+                # Count newlines only between the previous hit and this one
+                chunk_line += data.count(b'\n', pos, start)
+                line = data[start:end].decode('utf-8', errors='ignore')
+                append(f"{file_path}:{chunk_line}:{line.strip()[:100]}")
+                
+                # Report each line once, resume on the next line
+                pos = end + 1
+                chunk_line += 1
+            
+            line_num += data.count(b'\n')
+    
+    return results
+
 def search_text_safe(pattern: str, path: str, max_results: int) -> str:
     """Safe text search with hard limits"""
-    import os
-    import re
-    
     # Validate inputs
     if not pattern or len(pattern) > 100:
         return "Invalid pattern"
@@ -343,40 +571,35 @@ def search_text_safe(pattern: str, path: str, max_results: int) -> str:
     max_files = 50
     
     try:
-        if os.path.isfile(path):
+        rg_results = search_with_ripgrep(pattern, path, max_results)
+        needle = pattern.encode('utf-8').lower()
+        if rg_results is not None:
+            results = rg_results
+        elif os.path.isfile(path):
             # Search single file
             if classify_file_type(path) == 'text':
-                with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                    for line_num, line in enumerate(f, 1):
-                        if pattern.lower() in line.lower():
-                            results.append(f"{path}:{line_num}:{line.strip()[:100]}")
-                            if len(results) >= max_results:
-                                break
+                results = search_file(path, needle, max_results)
         else:
-            # Search directory
-            for root, dirs, files in os.walk(path):
-                for file in files:
-                    if files_checked >= max_files:
-                        break
+            # Search directory - reads are I/O bound, so fan out across threads
+            # and consume the results in walk order to keep output deterministic
+            paths = [entry.path for entry in islice(iter_text_files(path), max_files)]
+            with ThreadPoolExecutor(max_workers=SEARCH_WORKERS) as executor:
+                futures = [executor.submit(search_file, fp, needle, max_results) for fp in paths]
+                for future in futures:
+                    files_checked += 1
+                    try:
+                        results.extend(future.result())
+                    except (OSError, ValueError):
+                        continue
                     
-                    file_path = os.path.join(root, file)
-                    if classify_file_type(file) == 'text':
-                        files_checked += 1
-                        try:
-                            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                                for line_num, line in enumerate(f, 1):
-                                    if pattern.lower() in line.lower():
-                                        results.append(f"{file_path}:{line_num}:{line.strip()[:100]}")
-                                        if len(results) >= max_results:
-                                            break
-                        except:
-                            continue
-                        
-                        if len(results) >= max_results:
-                            break
-                            
-                if len(results) >= max_results or files_checked >= max_files:
-                    break
+                    if len(results) >= max_results:
+                        break
+                
+                # Drop files still queued once the result limit is reached
+                for future in futures:
+                    future.cancel()
+            
+            results = results[:max_results]
         
         if not results:
             return f"No matches found for '{pattern}'"
@@ -464,11 +687,9 @@ Valid actions: read_text_file, describe_binary_file, list_dir, pwd, whoami
 Use ONLY actual files from environment."""
 
     try:
-        response = ollama_client.chat(model=OLLAMA_MODEL, messages=[
+        revised_plan = validate_plan(chat_plan_json([
             {'role': 'user', 'content': prompt}
-        ])
-        
-        revised_plan = validate_plan(response['message']['content'].strip())
+        ]).strip())
         if revised_plan:
             state["plan"] = revised_plan["steps"]
             state["current_step"] = 0
@@ -489,54 +710,29 @@ Use ONLY actual files from environment."""
         print(f"✅ Emergency plan revision: {e}")
     
     return state
-    print("👁️ Observing...")
-    
-    # Verify step completion
-    state["step_success"] = state["result"].startswith("SUCCESS:")
-    
-    if state["step_success"]:
-        step = state["plan"][state["current_step"]]
-        print(f"✅ Step {state['current_step']+1} completed: {step['action']} {step.get('target', '')}")
-        state["current_step"] += 1
-        state["failure_count"] = 0  # Reset failure count on success
-    else:
-        step = state["plan"][state["current_step"]]
-        state["failure_count"] += 1
-        print(f"❌ Step {state['current_step']+1} failed ({state['failure_count']}/2): {step['action']} {step.get('target', '')}")
-        # Keep current_step same to retry
-    
-    state["observation"] = f"Step {state['step_count']} done - Success: {state['step_success']}"
-    
-    # Smart memory: save with success status
-    if state["current_step"] <= len(state["plan"]):
-        step_desc = f"{state['plan'][min(state['current_step']-1, len(state['plan'])-1)]['action']}"
-        save_smart_memory(step_desc, state['result'], state['step_success'])
-    
-    state["step_count"] += 1
-    return state
 
 def observe(state: AgentState) -> AgentState:
     print("👁️ Observing...")
     
     # Verify step completion
+    previous_success = state["step_success"]
     state["step_success"] = state["result"].startswith("SUCCESS:")
     
+    # execute_step only runs while current_step indexes the plan
+    step = state["plan"][state["current_step"]]
     if state["step_success"]:
-        step = state["plan"][state["current_step"]]
         print(f"✅ Step {state['current_step']+1} completed: {step['action']} {step.get('target', '')}")
         state["current_step"] += 1
         state["failure_count"] = 0  # Reset failure count on success
     else:
-        step = state["plan"][state["current_step"]]
         state["failure_count"] += 1
         print(f"❌ Step {state['current_step']+1} failed ({state['failure_count']}/2): {step['action']} {step.get('target', '')}")
     
     state["observation"] = f"Step {state['step_count']} done - Success: {state['step_success']}"
     
-    # Smart memory: save with success status
-    if state["current_step"] <= len(state["plan"]):
-        step_desc = f"{state['plan'][min(state['current_step'] if state['step_success'] else state['current_step'], len(state['plan'])-1)]['action']}"
-        save_smart_memory(step_desc, state['result'], state['step_success'])
+    # Smart memory: only record outcome changes and repeated failures
+    if state["step_success"] != previous_success or state["failure_count"] >= 2:
+        save_smart_memory(step["action"], state['result'], state['step_success'])
     
     state["step_count"] += 1
     return state
@@ -559,43 +755,44 @@ def should_continue(state: AgentState) -> str:
         print(f"🔄 Continuing... ({remaining} steps remaining)")
         return "execute_step"
 
-# Initialize memory on startup
-init_memory()
-
-graph = StateGraph(AgentState)
-
-graph.add_node("ground", ground)
-graph.add_node("plan", plan)
-graph.add_node("execute_step", execute_step)
-graph.add_node("act", act)
-graph.add_node("observe", observe)
-graph.add_node("revise_plan", revise_plan)
-
-graph.add_edge("ground", "plan")
-graph.add_edge("plan", "execute_step")
-graph.add_edge("execute_step", "act")
-graph.add_edge("act", "observe")
-graph.add_edge("revise_plan", "execute_step")
-graph.add_conditional_edges("observe", should_continue)
-graph.set_entry_point("ground")
-
-agent = graph.compile()
-
-initial_state = {
-    "task": "Explore this directory",
-    "thought": "",
-    "result": "",
-    "observation": "",
-    "step_count": 1,
-    "tool_request": "",
-    "plan": [],
-    "current_step": 0,
-    "environment_facts": "",
-    "step_success": False,
-    "failure_count": 0
-}
-
-final_state = agent.invoke(initial_state)
-
-print("\n✅ Final State:")
-print(final_state)
+if __name__ == "__main__":
+    # Initialize memory on startup
+    init_memory()
+
+    graph = StateGraph(AgentState)
+
+    graph.add_node("ground", ground)
+    graph.add_node("plan", plan)
+    graph.add_node("execute_step", execute_step)
+    graph.add_node("act", act)
+    graph.add_node("observe", observe)
+    graph.add_node("revise_plan", revise_plan)
+
+    graph.add_edge("ground", "plan")
+    graph.add_edge("plan", "execute_step")
+    graph.add_edge("execute_step", "act")
+    graph.add_edge("act", "observe")
+    graph.add_edge("revise_plan", "execute_step")
+    graph.add_conditional_edges("observe", should_continue)
+    graph.set_entry_point("ground")
+
+    agent = graph.compile()
+
+    initial_state = {
+        "task": "Explore this directory",
+        "thought": "",
+        "result": "",
+        "observation": "",
+        "step_count": 1,
+        "tool_request": "",
+        "plan": [],
+        "current_step": 0,
+        "environment_facts": "",
+        "step_success": False,
+        "failure_count": 0
+    }
+
+    final_state = agent.invoke(initial_state)
+
+    print("\n✅ Final State:")
+    print(final_state)
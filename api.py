@@ -5,7 +5,8 @@ Production HTTP wrapper for the core agent system.
 
 from flask import Flask, request, jsonify
 import logging
-from cli import run_agent, load_config, setup_logging
+from cli import run_agent_with_progress, load_config, setup_logging
+from agent import warm_model
 
 app = Flask(__name__)
 
@@ -27,7 +28,7 @@ def execute_task():
         config = load_config()
         
         logging.info(f"API request: {task}")
-        result = run_agent(task, config)
+        result = run_agent_with_progress(task, config, quiet=True)
         
         return jsonify({
             "status": "success",
@@ -57,4 +58,6 @@ def status():
 
 if __name__ == '__main__':
     setup_logging()
+    if not warm_model():
+        logging.warning("Planner model warmup failed; first request will pay the model load")
     app.run(host='0.0.0.0', port=8080, debug=False)
@@ -5,6 +5,7 @@ Built on the frozen autonomous agent core.
 """
 
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
@@ -47,7 +48,8 @@ class CodebaseAuditor:
         """Run all audit types as separate focused tasks"""
         results = {}
         
-        # Fixed sequence of specific audit tasks
+        # Fixed sequence of specific audit tasks - each matches an entry in
+        # agent.TASK_TEMPLATES so its plan is emitted without an LLM call
         audit_tasks = [
             ("structure", "List all Python files and directories"),
             ("todos", "Find TODO comments"),
@@ -59,24 +61,33 @@ class CodebaseAuditor:
         if not quiet:
             console.print("[bold yellow]Running Full Codebase Audit...[/bold yellow]\n")
         
-        for audit_name, task in audit_tasks:
-            if not quiet:
-                console.print(f"[cyan]Running {audit_name} audit...[/cyan]")
-            
+        def run_one(task: str) -> dict:
             try:
                 result = run_agent_with_progress(task, self.config, quiet=True, mode="codebase_auditor")
-                results[audit_name] = {
+                return {
                     "status": "success" if result.get("step_success") else "failed",
                     "result": result.get("result", "No result"),
                     "steps": result.get("step_count", 0)
                 }
             except Exception as e:
-                results[audit_name] = {
+                return {
                     "status": "error",
                     "result": str(e),
                     "steps": 0
                 }
         
+        # Audits are independent, run them concurrently so the model server
+        # can batch their planner requests (set OLLAMA_NUM_PARALLEL on the server)
+        with ThreadPoolExecutor(max_workers=len(audit_tasks)) as executor:
+            futures = []
+            for audit_name, task in audit_tasks:
+                if not quiet:
+                    console.print(f"[cyan]Running {audit_name} audit...[/cyan]")
+                futures.append((audit_name, executor.submit(run_one, task)))
+            
+            for audit_name, future in futures:
+                results[audit_name] = future.result()
+        
         if not quiet:
             self.display_audit_summary(results)
         
@@ -5,53 +5,90 @@ Production wrapper for the core agent system.
 """
 
 import argparse
-import json
+import atexit
 import logging
+import os
 import datetime
+import re
+import sys
+from collections import Counter
+from functools import lru_cache
 from pathlib import Path
-from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
-from rich.panel import Panel
-from rich.table import Table
-from rich.text import Text
-from rich import print as rprint
-from agent import AgentState, ground, plan, execute_step, act, observe, revise_plan, should_continue, init_memory, load_system_prompt
-from langgraph.graph import StateGraph, END
 
-console = Console()
+from jsonio import json_dumps, json_loads
+
+# rich, langgraph and agent (ollama, sqlite) are imported where they are used
+# so that --help and argument errors don't pay for them.
+
+@lru_cache(maxsize=1)
+def _get_console():
+    """Shared rich console, created on first use"""
+    from rich.console import Console
+    return Console()
+
+_log_listener = None
 
 def setup_logging(level: str = "INFO", quiet: bool = False):
-    """Configure logging"""
+    """Configure logging (file/console writes happen on a background listener thread)"""
+    global _log_listener
+    if _log_listener is not None:
+        return
+    
+    import queue
+    from logging.handlers import QueueHandler, QueueListener
+    
+    # delay=True: agent.log is only opened once something is actually logged
+    handlers = [logging.FileHandler('agent.log', delay=True)]
     if quiet:
-        logging.basicConfig(level=logging.ERROR, handlers=[logging.FileHandler('agent.log')])
+        log_level = logging.ERROR
+        formatter = logging.Formatter(logging.BASIC_FORMAT)
     else:
-        logging.basicConfig(
-            level=getattr(logging, level.upper()),
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('agent.log'),
-                logging.StreamHandler()
-            ]
-        )
+        log_level = getattr(logging, level.upper())
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    # QueueHandler pre-formats records; keep that to the bare message so the
+    # listener's handlers apply the real format exactly once
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    logging.basicConfig(level=log_level, handlers=[queue_handler])
+    
+    _log_listener = QueueListener(log_queue, *handlers)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
 
 def load_config(config_path: str = "config.json") -> dict:
-    """Load configuration"""
+    """Load configuration (cached until the file changes; treat the returned dict as read-only)"""
+    try:
+        mtime_ns = os.stat(config_path).st_mtime_ns
+    except OSError:
+        mtime_ns = None
+    return _load_config(config_path, mtime_ns)
+
+@lru_cache(maxsize=8)
+def _load_config(config_path: str, mtime_ns) -> dict:
     default_config = {
-        "model": "llama3.2:1b",
+        "model": "llama3.2:1b-instruct-q4_K_M",
         "max_steps": 8,
         "retry_limit": 2,
         "memory_db": "agent_memory.db"
     }
     
-    if Path(config_path).exists():
-        with open(config_path) as f:
-            user_config = json.load(f)
-            default_config.update(user_config)
+    if mtime_ns is not None:
+        user_config = json_loads(Path(config_path).read_bytes())
+        default_config.update(user_config)
     
     return default_config
 
+@lru_cache(maxsize=1)
 def create_agent():
-    """Create the agent graph"""
+    """Create the agent graph (compiled once per process)"""
+    from langgraph.graph import StateGraph
+    from agent import AgentState, ground, plan, execute_step, act, observe, revise_plan, should_continue
+    
     graph = StateGraph(AgentState)
     
     graph.add_node("ground", ground)
@@ -71,197 +108,201 @@ def create_agent():
     
     return graph.compile()
 
-def run_agent_with_progress(task: str, config: dict, quiet: bool = False, mode: str = "default") -> dict:
-    """Run the agent with progress display"""
+# Graph input shared by every run. plan is an empty tuple so copies can't
+# alias a mutable list - the plan node always assigns a fresh one.
+_INITIAL_TEMPLATE = {
+    "task": "",
+    "thought": "",
+    "result": "",
+    "observation": "",
+    "step_count": 1,
+    "tool_request": "",
+    "plan": (),
+    "current_step": 0,
+    "environment_facts": "",
+    "step_success": False,
+    "failure_count": 0,
+    "system_prompt": ""
+}
+
+def build_initial_state(task: str, mode: str = "default") -> dict:
+    """Fresh graph input state for a task"""
+    from agent import load_system_prompt
+    
+    state = _INITIAL_TEMPLATE.copy()
+    state["task"] = task
+    state["system_prompt"] = load_system_prompt(mode)
+    return state
+
+def run_agent_with_progress(task: str, config: dict, quiet: bool = False, mode: str = "default",
+                            show_progress: bool = None) -> dict:
+    """Run the agent with progress display (by default only when stdout is a terminal)"""
+    from agent import init_memory
+    
     if not quiet:
-        console.print(Panel(f"[bold blue]Task:[/bold blue] {task}", title="🤖 Autonomous Agent"))
+        from rich.panel import Panel
+        _get_console().print(Panel(f"[bold blue]Task:[/bold blue] {task}", title="🤖 Autonomous Agent"))
     
     init_memory()
     agent = create_agent()
     
-    initial_state = {
-        "task": task,
-        "thought": "",
-        "result": "",
-        "observation": "",
-        "step_count": 1,
-        "tool_request": "",
-        "plan": [],
-        "current_step": 0,
-        "environment_facts": "",
-        "step_success": False,
-        "failure_count": 0,
-        "system_prompt": load_system_prompt(mode)
-    }
+    initial_state = build_initial_state(task, mode)
     
-    if quiet:
+    if show_progress is None:
+        show_progress = sys.stdout.isatty()
+    if quiet or not show_progress:
         return agent.invoke(initial_state)
     
+    from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
+    
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
         BarColumn(),
         TaskProgressColumn(),
-        console=console
+        console=_get_console(),
+        refresh_per_second=4,
+        transient=True
     ) as progress:
         
         task_id = progress.add_task("Executing...", total=config.get("max_steps", 8))
         
-        class ProgressAgent:
-            def __init__(self, agent, progress, task_id):
-                self.agent = agent
-                self.progress = progress
-                self.task_id = task_id
-                self.step = 0
-            
-            def invoke(self, state):
-                result = self.agent.invoke(state)
-                self.progress.update(self.task_id, completed=result.get("step_count", 1))
-                return result
-        
-        progress_agent = ProgressAgent(agent, progress, task_id)
-        return progress_agent.invoke(initial_state)
+        # stream_mode="values" yields the full state after every node, so the
+        # bar tracks the graph as it runs and the last chunk is the final state
+        result = initial_state
+        for result in agent.stream(initial_state, stream_mode="values"):
+            progress.update(task_id, completed=result.get("step_count", 1))
+        return result
+
+# Column schema for the execution summary table
+_SUMMARY_COLUMNS = (("Metric", "cyan"), ("Value", "white"))
 
 def display_results(result: dict, verbose: bool = False):
     """Display results in a nice format"""
+    from rich.table import Table
+    from rich.text import Text
     
-    # Status
-    status = "✅ Success" if result.get("step_success", False) else "❌ Failed"
-    console.print(f"\n[bold green]{status}[/bold green]")
-    
-    # Add audit summary for specialized modes
-    if result.get("system_prompt", "").startswith("You are a Codebase Auditor"):
-        display_audit_summary(result, "codebase")
-    elif result.get("system_prompt", "").startswith("You are a Config Inspector"):
-        display_audit_summary(result, "config")
-    elif result.get("system_prompt", "").startswith("You are a Repo Hygiene Agent"):
-        display_audit_summary(result, "repo")
-    
-    # Summary table
-    table = Table(title="Execution Summary")
-    table.add_column("Metric", style="cyan")
-    table.add_column("Value", style="white")
-    
-    table.add_row("Steps Completed", str(result.get("step_count", 0)))
-    table.add_row("Plan Steps", str(len(result.get("plan", []))))
-    table.add_row("Current Step", str(result.get("current_step", 0)))
-    table.add_row("Failures", str(result.get("failure_count", 0)))
-    
-    console.print(table)
-    
-    # Plan executed
-    if result.get("plan"):
-        console.print("\n[bold]Plan Executed:[/bold]")
-        for i, step in enumerate(result["plan"], 1):
-            status_icon = "✅" if i <= result.get("current_step", 0) else "⏳"
-            action = step.get("action", "unknown")
-            target = step.get("target", "")
-            console.print(f"  {status_icon} {i}. {action} {target}")
-    
-    # Verbose output
-    if verbose:
-        console.print(f"\n[bold]Final Result:[/bold] {result.get('result', 'No result')}")
-        console.print(f"[bold]Last Thought:[/bold] {result.get('thought', 'No thought')}")
-
-def display_audit_summary(result: dict, mode: str = "codebase"):
-    """Format output according to specified format"""
-    
-    if format_type == "json":
-        return json.dumps({
-            "task": result.get("task", ""),
-            "status": "success" if result.get("step_success", False) else "failed",
-            "mode": mode,
-            "steps_completed": result.get("step_count", 0),
-            "plan_steps": len(result.get("plan", [])),
-            "failures": result.get("failure_count", 0),
-            "result": result.get("result", ""),
-            "plan": result.get("plan", []),
-            "timestamp": datetime.datetime.now().isoformat()
-        }, indent=2)
-    
-    elif format_type == "markdown":
-        status_icon = "✅" if result.get("step_success", False) else "❌"
-        md = f"""# Audit Report
-
-**Status**: {status_icon} {"Success" if result.get("step_success", False) else "Failed"}  
-**Mode**: {mode}  
-**Task**: {result.get("task", "")}  
-**Steps Completed**: {result.get("step_count", 0)}  
-**Failures**: {result.get("failure_count", 0)}  
-
-## Plan Executed
-"""
-        for i, step in enumerate(result.get("plan", []), 1):
-            status = "✅" if i <= result.get("current_step", 0) else "⏳"
-            action = step.get("action", "unknown")
-            target = step.get("target", "")
-            md += f"{status} {i}. {action} {target}\n"
-        
-        md += f"\n## Result\n```\n{result.get('result', 'No result')}\n```\n"
-        return md
-    
-    elif format_type == "summary":
-        status = "SUCCESS" if result.get("step_success", False) else "FAILED"
-        return f"{status}: {result.get('observation', 'No observation')} | Steps: {result.get('step_count', 0)} | Failures: {result.get('failure_count', 0)}"
+    console = _get_console()
     
-    else:  # console format
-        return None  # Use existing display_results function
-    """Display audit-specific summary"""
-    if mode == "codebase":
-        console.print("\n[bold yellow]Codebase Audit Summary:[/bold yellow]")
-        final_result = result.get("result", "")
+    # Render everything into one buffer and write it in a single call
+    with console.capture() as capture:
+        # Status
+        status = "✅ Success" if result.get("step_success", False) else "❌ Failed"
+        console.print(Text(f"\n{status}", style="bold green"), highlight=False)
         
-        if "import" in final_result.lower():
-            import_count = final_result.count("import")
-            console.print(f"• Import statements found: {import_count}")
+        # Add audit summary for specialized modes
+        if result.get("system_prompt", "").startswith("You are a Codebase Auditor"):
+            display_audit_summary(result, "codebase")
+        elif result.get("system_prompt", "").startswith("You are a Config Inspector"):
+            display_audit_summary(result, "config")
+        elif result.get("system_prompt", "").startswith("You are a Repo Hygiene Agent"):
+            display_audit_summary(result, "repo")
         
-        if "todo" in final_result.lower():
-            console.print("• TODO comments detected")
+        # Summary table
+        table = Table(title="Execution Summary")
+        for name, style in _SUMMARY_COLUMNS:
+            table.add_column(name, style=style)
         
-        if "config" in final_result.lower() or ".env" in final_result or "config.json" in final_result:
-            console.print("• Configuration files present")
-            
-    elif mode == "config":
-        console.print("\n[bold yellow]Config Inspection Summary:[/bold yellow]")
-        final_result = result.get("result", "")
+        table.add_row("Steps Completed", str(result.get("step_count", 0)))
+        table.add_row("Plan Steps", str(len(result.get("plan", []))))
+        table.add_row("Current Step", str(result.get("current_step", 0)))
+        table.add_row("Failures", str(result.get("failure_count", 0)))
         
-        if ".env" in final_result:
-            console.print("• Environment files detected")
+        console.print(table)
         
-        if "config.json" in final_result or "settings" in final_result.lower():
-            console.print("• Configuration files found")
-            
-        if "debug" in final_result.lower() or "localhost" in final_result.lower():
-            console.print("• Development flags detected")
+        # Plan executed
+        if result.get("plan"):
+            current_step = result.get("current_step", 0)
+            plan_lines = "\n".join(
+                f"  {'✅' if i <= current_step else '⏳'} {i}. {step.get('action', 'unknown')} {step.get('target', '')}"
+                for i, step in enumerate(result["plan"], 1)
+            )
+            console.print(Text.assemble(("\nPlan Executed:", "bold"), "\n", plan_lines), highlight=False)
         
-        if "dev" in final_result.lower() or "test" in final_result.lower():
-            console.print("• Environment indicators found")
-            
-    elif mode == "repo":
-        console.print("\n[bold yellow]Repository Hygiene Summary:[/bold yellow]")
-        final_result = result.get("result", "")
-        
-        if "README" in final_result:
-            console.print("• README file present")
-        
-        if "LICENSE" in final_result:
-            console.print("• LICENSE file present")
-            
-        if ".log" in final_result or "log" in final_result.lower():
-            console.print("• Log files detected")
-        
-        if "TODO" in final_result:
-            todo_count = final_result.count("TODO")
-            console.print(f"• TODO markers found: {todo_count}")
-            
-        if ".tmp" in final_result or ".class" in final_result:
-            console.print("• Build artifacts detected")
+        # Verbose output
+        if verbose:
+            console.print(Text.assemble(("\nFinal Result:", "bold"), f" {result.get('result', 'No result')}"), highlight=False)
+            console.print(Text.assemble(("Last Thought:", "bold"), f" {result.get('thought', 'No thought')}"), highlight=False)
+    
+    console.file.write(capture.get())
+    console.file.flush()
+
+# Markers checked by display_audit_summary, matched in a single scan. The
+# lookahead reports overlapping hits and longer tokens come first where one
+# is a prefix of another.
+SUMMARY_MARKERS = re.compile(
+    r"(?=(config\.json|config|import|todo|\.env|settings|debug|localhost|dev|test"
+    r"|readme|license|log|\.tmp|\.class))",
+    re.IGNORECASE
+)
+
+def tally_markers(text: str) -> tuple:
+    """Count summary markers in one pass: (exact-case counts, lowercased counts)"""
+    exact = Counter(m.group(1) for m in SUMMARY_MARKERS.finditer(text))
+    lowered = Counter()
+    for token, count in exact.items():
+        lowered[token.lower()] += count
+    return exact, lowered
+
+# Per-mode summary: title plus (fact, template) bullets, shown when the fact
+# is truthy and filled in with format_map
+_AUDIT_SUMMARIES = {
+    "codebase": ("Codebase Audit Summary:", (
+        ("imports", "• Import statements found: {import_count}"),
+        ("todo", "• TODO comments detected"),
+        ("config_present", "• Configuration files present"),
+    )),
+    "config": ("Config Inspection Summary:", (
+        ("env_files", "• Environment files detected"),
+        ("config_found", "• Configuration files found"),
+        ("dev_flags", "• Development flags detected"),
+        ("env_indicators", "• Environment indicators found"),
+    )),
+    "repo": ("Repository Hygiene Summary:", (
+        ("readme", "• README file present"),
+        ("license", "• LICENSE file present"),
+        ("logs", "• Log files detected"),
+        ("todo_count", "• TODO markers found: {todo_count}"),
+        ("artifacts", "• Build artifacts detected"),
+    )),
+}
+
+def display_audit_summary(result: dict, mode: str = "codebase"):
+    """Display audit-specific summary"""
+    from rich.text import Text
+    
+    final_result = result.get("result", "")
+    exact, lowered = tally_markers(final_result)
+    facts = {
+        "imports": lowered["import"],
+        "import_count": exact["import"],
+        "todo": lowered["todo"],
+        "config_present": lowered["config"] or lowered["config.json"] or exact[".env"],
+        "env_files": exact[".env"],
+        "config_found": exact["config.json"] or lowered["settings"],
+        "dev_flags": lowered["debug"] or lowered["localhost"],
+        "env_indicators": lowered["dev"] or lowered["test"],
+        "readme": exact["README"],
+        "license": exact["LICENSE"],
+        "logs": lowered["log"],
+        "todo_count": exact["TODO"],
+        "artifacts": exact[".tmp"] or exact[".class"],
+    }
+    
+    title, bullets = _AUDIT_SUMMARIES.get(mode, ("", ()))
+    lines = [template.format_map(facts) for fact, template in bullets if facts[fact]]
     
     # Count files analyzed
-    if "SUCCESS:" in result.get("result", ""):
-        console.print(f"• Analysis completed successfully")
+    if "SUCCESS:" in final_result:
+        lines.append("• Analysis completed successfully")
+    
+    lines.append("")
     
-    console.print("")
+    # Plain Text: nothing here needs markup parsing or repr highlighting
+    text = Text("\n".join(lines))
+    if title:
+        text = Text.assemble((f"\n{title}", "bold yellow"), "\n", text)
+    _get_console().print(text, highlight=False)
 
 def format_output(result: dict, format_type: str, mode: str = "default") -> str:
     """Format output according to specified format"""
@@ -277,7 +318,7 @@ def format_output(result: dict, format_type: str, mode: str = "default") -> str:
             # Count files by type
             text_files = env_facts.count('[text]')
             binary_files = env_facts.count('[binary]')
-            directories = env_facts.count('drwx')
+            directories = env_facts.count('[dir]')
             
             clean_env_facts = {
                 "current_directory": current_dir.replace("Current directory: ", ""),
@@ -291,7 +332,7 @@ def format_output(result: dict, format_type: str, mode: str = "default") -> str:
         else:
             clean_env_facts = {}
         
-        return json.dumps({
+        return json_dumps({
             "task": result.get("task", ""),
             "status": "success" if result.get("step_success", False) else "failed",
             "mode": mode,
@@ -304,7 +345,7 @@ def format_output(result: dict, format_type: str, mode: str = "default") -> str:
             "observation": result.get("observation", ""),
             "timestamp": datetime.datetime.now().isoformat(),
             "exit_code": result.get("exit_code", 0)
-        }, indent=2)
+        })
     
     elif format_type == "markdown":
         status_icon = "✅" if result.get("step_success", False) else "❌"
@@ -334,31 +375,92 @@ def format_output(result: dict, format_type: str, mode: str = "default") -> str:
     else:  # console format
         return None  # Use existing display_results function
 
+def read_git_head(start: Path):
+    """Resolve HEAD by reading the repository files directly; None if not possible"""
+    for directory in (start, *start.parents):
+        git_dir = directory / ".git"
+        if git_dir.exists():
+            break
+    else:
+        return None
+    
+    if git_dir.is_file():  # worktrees and submodules point elsewhere
+        return None
+    
+    head = (git_dir / "HEAD").read_text().strip()
+    if not head.startswith("ref: "):
+        return head  # detached HEAD
+    
+    ref = head[5:]
+    try:
+        return (git_dir / ref).read_text().strip()
+    except FileNotFoundError:
+        pass
+    
+    # Ref may only exist in packed-refs ("<sha> <ref>" lines)
+    try:
+        with open(git_dir / "packed-refs") as f:
+            for line in f:
+                sha, _, name = line.rstrip("\n").partition(" ")
+                if name == ref:
+                    return sha
+    except FileNotFoundError:
+        pass
+    return None
+
+def get_commit_hash() -> str:
+    """Current commit hash for report metadata, or "unknown" outside a repo"""
+    try:
+        commit_hash = read_git_head(Path.cwd())
+        if commit_hash:
+            return commit_hash
+    except OSError:
+        pass
+    
+    # Layouts read_git_head doesn't handle (worktrees, reftable) go through git
+    try:
+        import subprocess
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], 
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+WARN_RE = re.compile(r"fixme|debug|localhost|password|secret", re.IGNORECASE)
+TODO_RE = re.compile(r"todo", re.IGNORECASE)
+
 def determine_exit_code(result: dict) -> int:
     """Determine exit code based on result"""
     if not result.get("step_success", False):
         return 2  # Failure
     
-    # Check for warnings based on content
-    final_result = result.get("result", "").lower()
-    observation = result.get("observation", "").lower()
-    
-    # Warning conditions
-    warning_indicators = [
-        "todo" in final_result and final_result.count("todo") > 10,
-        "fixme" in final_result,
-        "debug" in final_result,
-        "localhost" in final_result,
-        "password" in final_result or "secret" in final_result,
-        result.get("failure_count", 0) > 0
-    ]
-    
-    if any(warning_indicators):
+    # Warning conditions: earlier failures, risky markers, or a TODO backlog
+    final_result = result.get("result", "")
+    if (result.get("failure_count", 0) > 0
+            or WARN_RE.search(final_result)
+            or len(TODO_RE.findall(final_result)) > 10):
         return 1  # Warning
     
     return 0  # Success
 
-def main():
+LOG_LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR"]
+MODES = ["default", "codebase_auditor", "config_inspector", "repo_hygiene"]
+FORMATS = ["console", "json", "markdown", "summary"]
+
+# Fast-path flag table: dest and allowed choices (None = free value) for
+# options taking a value, plus the store_true switches
+_VALUE_FLAGS = {
+    "--config": ("config", None),
+    "--log-level": ("log_level", LOG_LEVELS),
+    "--mode": ("mode", MODES),
+    "--format": ("format", FORMATS),
+    "--out": ("out", None),
+}
+_SWITCH_FLAGS = {"--json": "json", "--quiet": "quiet", "-q": "quiet", "--verbose": "verbose", "-v": "verbose"}
+
+def build_parser() -> argparse.ArgumentParser:
+    """Full argparse parser, used for --help, errors and unusual argument shapes"""
     parser = argparse.ArgumentParser(
         description="A deterministic, CI-native repository hygiene gate that enforces policy using bounded, explainable analysis — not heuristics or learning.",
         epilog="""
@@ -379,21 +481,63 @@ For more information, visit: https://github.com/yourusername/autonomous-auditor
     )
     parser.add_argument("task", help="Task for the agent to execute")
     parser.add_argument("--config", default="config.json", help="Configuration file")
-    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"])
-    parser.add_argument("--mode", default="default", choices=["default", "codebase_auditor", "config_inspector", "repo_hygiene"], help="Agent mode")
-    parser.add_argument("--format", default="console", choices=["console", "json", "markdown", "summary"], help="Output format")
+    parser.add_argument("--log-level", default="INFO", choices=LOG_LEVELS)
+    parser.add_argument("--mode", default="default", choices=MODES, help="Agent mode")
+    parser.add_argument("--format", default="console", choices=FORMATS, help="Output format")
     parser.add_argument("--out", help="Output file for results")
     parser.add_argument("--json", action="store_true", help="Output results as JSON to stdout")
     parser.add_argument("--quiet", "-q", action="store_true", help="Minimal output")
     parser.add_argument("--verbose", "-v", action="store_true", help="Detailed output")
     
-    args = parser.parse_args()
+    return parser
+
+def fast_parse_args(argv: list):
+    """Parse the common argument shapes without argparse; None when argparse must handle argv"""
+    args = argparse.Namespace(task=None, config="config.json", log_level="INFO", mode="default",
+                              format="console", out=None, json=False, quiet=False, verbose=False)
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in _SWITCH_FLAGS:
+            setattr(args, _SWITCH_FLAGS[arg], True)
+        elif arg in _VALUE_FLAGS:
+            if i + 1 >= len(argv):
+                return None
+            dest, choices = _VALUE_FLAGS[arg]
+            value = argv[i + 1]
+            if (choices is not None and value not in choices) or value.startswith("-"):
+                return None
+            setattr(args, dest, value)
+            i += 1
+        elif arg.startswith("-") or args.task is not None:
+            return None
+        else:
+            args.task = arg
+        i += 1
+    return args if args.task is not None else None
+
+def fast_exit(code: int):
+    """Flush memory, logs and streams, then exit without interpreter teardown"""
+    # os._exit skips atexit handlers, so do their work first
+    agent = sys.modules.get("agent")
+    if agent is not None:
+        agent.close_memory()
+    if _log_listener is not None:
+        _log_listener.stop()
+    logging.shutdown()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(code)
+
+def main():
+    args = fast_parse_args(sys.argv[1:]) or build_parser().parse_args()
     
     setup_logging(args.log_level, args.quiet)
     config = load_config(args.config)
     
     try:
-        result = run_agent_with_progress(args.task, config, args.quiet, args.mode)
+        show_progress = args.format == "console" and sys.stdout.isatty()
+        result = run_agent_with_progress(args.task, config, args.quiet, args.mode, show_progress)
         
         # Determine exit code
         exit_code = determine_exit_code(result)
@@ -409,16 +553,7 @@ For more information, visit: https://github.com/yourusername/autonomous-auditor
                 "exit_code": exit_code
             }
             
-            # Try to get commit hash
-            try:
-                import subprocess
-                commit_hash = subprocess.check_output(
-                    ["git", "rev-parse", "HEAD"], 
-                    stderr=subprocess.DEVNULL
-                ).decode().strip()
-                metadata["commit_hash"] = commit_hash
-            except:
-                metadata["commit_hash"] = "unknown"
+            metadata["commit_hash"] = get_commit_hash()
             
             result.update(metadata)
         
@@ -430,19 +565,19 @@ For more information, visit: https://github.com/yourusername/autonomous-auditor
             formatted_output = format_output(result, args.format, mode)
             
             if args.out:
-                with open(args.out, 'w') as f:
+                with open(args.out, 'w', encoding='utf-8') as f:
                     f.write(formatted_output)
                 if not args.quiet:
-                    console.print(f"[green]Results saved to {args.out}[/green]")
+                    _get_console().print(f"[green]Results saved to {args.out}[/green]")
             else:
                 print(formatted_output)
         else:
             # Console format (existing behavior)
             if args.out:
-                with open(args.out, 'w') as f:
-                    json.dump(result, f, indent=2)
+                with open(args.out, 'w', encoding='utf-8') as f:
+                    f.write(json_dumps(result))
                 if not args.quiet:
-                    console.print(f"[green]Results saved to {args.out}[/green]")
+                    _get_console().print(f"[green]Results saved to {args.out}[/green]")
             
             if args.json:
                 # Legacy --json flag support
@@ -456,7 +591,7 @@ For more information, visit: https://github.com/yourusername/autonomous-auditor
                     "plan": result.get("plan", []),
                     "exit_code": exit_code
                 }
-                print(json.dumps(json_output, indent=2))
+                print(json_dumps(json_output))
             elif not args.quiet and args.format == "console":
                 # Only show detailed results for console format
                 display_results(result, args.verbose)
@@ -466,14 +601,14 @@ For more information, visit: https://github.com/yourusername/autonomous-auditor
                 print(f"{status}: {result.get('observation', 'No observation')}")
         
         # Exit with appropriate code
-        exit(exit_code)
+        fast_exit(exit_code)
             
     except Exception as e:
         if args.quiet:
             print(f"ERROR: {e}")
         else:
-            console.print(f"[red]Error: {e}[/red]")
-        exit(2)  # Always exit 2 for exceptions
+            _get_console().print(f"[red]Error: {e}[/red]")
+        fast_exit(2)  # Always exit 2 for exceptions
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,19 @@
+"""
+JSON Helpers
+Shared by the agent CLI and the policy layer; orjson is used when installed.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+json_loads = orjson.loads if orjson else json.loads
+
+def json_dumps(obj) -> str:
+    """Pretty-print obj as JSON (2-space indent), using orjson when installed"""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
@@ -0,0 +1,515 @@
+"""
+Behavior tests for the optimized code paths.
+Each fast path is checked against the straightforward implementation it replaced.
+"""
+
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+# agent opens its memory database on import, keep it out of the repository
+os.environ.setdefault("MEMORY_DB", os.path.join(tempfile.mkdtemp(), "agent_memory.db"))
+
+import yaml
+
+import agent
+import cli
+import policy
+
+def line_scan(file_path, needle, max_results):
+    """Reference search: one line at a time, as search_file used to work"""
+    results = []
+    with open(file_path, 'rb') as f:
+        for line_num, line in enumerate(f, 1):
+            if needle in line.lower():
+                text = line.decode('utf-8', errors='ignore').strip()[:100]
+                results.append(f"{file_path}:{line_num}:{text}")
+                if len(results) >= max_results:
+                    break
+    return results
+
+def test_search_file_line_numbers():
+    """Test: search_file reports the same lines as a line-by-line scan"""
+
+    rng = random.Random(0)
+    words = ["TODO", "todo", "fixme", "import os", "x = 1", "", "naïve café", "# ToDo: later", "a" * 150]
+    old_chunk_size = agent.SEARCH_CHUNK_SIZE
+    agent.SEARCH_CHUNK_SIZE = 64  # force many chunk boundaries
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for i in range(50):
+                lines = [rng.choice(words) for _ in range(rng.randint(1, 200))]
+                content = "\n".join(lines) + rng.choice(["", "\n"])
+                file_path = os.path.join(tmp, f"sample_{i}.py")
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+
+                for needle in (b"todo", b"import", b"= 1", b"caf\xc3\xa9"):
+                    for max_results in (1, 5, 1000):
+                        expected = line_scan(file_path, needle, max_results)
+                        assert agent.search_file(file_path, needle, max_results) == expected, (file_path, needle)
+    finally:
+        agent.SEARCH_CHUNK_SIZE = old_chunk_size
+
+    print("✅ search_file line numbering test passed")
+
+def test_search_file_skips_empty_and_large():
+    """Test: empty files and files over MAX_SEARCH_FILE_SIZE are not searched"""
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, "empty.txt")
+        open(file_path, 'w').close()
+        assert agent.search_file(file_path, b"todo", 10) == []
+
+        file_path = os.path.join(tmp, "large.txt")
+        with open(file_path, 'wb') as f:
+            f.write(b"todo\n" * (agent.MAX_SEARCH_FILE_SIZE // 5 + 1))
+        assert agent.search_file(file_path, b"todo", 10) == []
+
+    print("✅ search_file size limit test passed")
+
+def test_ripgrep_matches_fallback():
+    """Test: with rg installed, search_with_ripgrep finds what the Python search finds"""
+
+    if not shutil.which('rg'):
+        print("⏭️  ripgrep not installed, search_with_ripgrep test skipped")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = {
+            "a.py": "x = 1  # TODO\n",
+            ".env": "TODO_TOKEN=1\n",  # dotfiles are searched
+            "ignored.txt": "todo in a gitignored file\n",  # .gitignore is not honoured
+            ".gitignore": "ignored.txt\n",
+            "sub/b.md": "nothing\nTodo: two\n",
+            ".hidden/c.py": "TODO hidden dir\n",
+            "node_modules/d.js": "// TODO dep\n",
+            "app.db": "TODO binary\n",
+            "agent_memory.db-wal": "TODO wal\n",
+        }
+        for name, content in files.items():
+            os.makedirs(os.path.dirname(os.path.join(tmp, name)), exist_ok=True)
+            with open(os.path.join(tmp, name), "w") as f:
+                f.write(content)
+        with open(os.path.join(tmp, "large.txt"), "wb") as f:
+            f.write(b"todo\n" * (agent.MAX_SEARCH_FILE_SIZE // 5 + 1))
+
+        expected = []
+        for entry in agent.iter_text_files(tmp):
+            expected.extend(agent.search_file(entry.path, b"todo", 50))
+        assert sorted(agent.search_with_ripgrep("todo", tmp, 50)) == sorted(expected)
+        assert len(expected) == 4
+
+    print("✅ search_with_ripgrep test passed")
+
+def test_classify_sqlite_sidecars():
+    """Test: SQLite journal files are binary, look-alike names are not"""
+
+    for name in ("agent_memory.db-wal", "agent_memory.db-shm", "agent_memory.db-journal", "cache.sqlite-wal"):
+        assert agent.classify_file_type(name) == 'binary', name
+    for name in ("release-journal", "notes-wal", "Makefile", "deploy.sh-shm.txt"):
+        assert agent.classify_file_type(name) == 'text', name
+
+    print("✅ SQLite sidecar classification test passed")
+
+def test_fast_parse_args():
+    """Test: fast_parse_args agrees with argparse or defers to it"""
+
+    common = [
+        ["Audit this codebase"],
+        ["--mode", "codebase_auditor", "Find TODO comments", "--verbose"],
+        ["List files", "--quiet", "--out", "results.json"],
+        ["--format", "json", "-q", "task", "--log-level", "DEBUG"],
+    ]
+    for argv in common:
+        assert cli.fast_parse_args(argv) == cli.build_parser().parse_args(argv), argv
+
+    rng = random.Random(0)
+    tokens = ["task", "other task", "--mode", "repo_hygiene", "bogus", "--format", "summary",
+              "--out", "-", "--json", "-q", "-v", "--quiet", "--config", "--help", "--mo", "--out=x"]
+    parser = cli.build_parser()
+    accepted = 0
+    for _ in range(2000):
+        argv = rng.choices(tokens, k=rng.randint(0, 6))
+        fast = cli.fast_parse_args(argv)
+        if fast is None:
+            continue  # argparse handles it
+        accepted += 1
+        try:
+            with contextlib.redirect_stderr(io.StringIO()):
+                assert fast == parser.parse_args(argv), argv
+        except SystemExit:
+            assert False, f"fast path accepted arguments argparse rejects: {argv}"
+    assert accepted > 0
+
+    print("✅ fast_parse_args test passed")
+
+class FakeStream:
+    """Stands in for ollama's streaming chat response"""
+
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.consumed = 0
+        self.closed = False
+
+    def __iter__(self):
+        for piece in self.pieces:
+            self.consumed += 1
+            yield {"message": {"content": piece}}
+
+    def close(self):
+        self.closed = True
+
+class FakeClient:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def chat(self, **kwargs):
+        return self.stream
+
+def test_chat_plan_json():
+    """Test: chat_plan_json stops at the end of the first top-level JSON object"""
+
+    rng = random.Random(0)
+    plan = {"steps": [
+        {"action": "search_text", "pattern": "{not a brace}", "target": ".", "max_results": 20},
+        {"action": "read_text_file", "target": "odd \\\"}\" name.md"},
+    ]}
+    text = json.dumps(plan)
+    old_client = agent.ollama_client
+    try:
+        for _ in range(200):
+            streamed = text + rng.choice(["", "\n", " {\"steps\": []}", "} trailing"])
+            cuts = sorted(rng.sample(range(1, len(streamed)), rng.randint(0, 8)))
+            pieces = [streamed[i:j] for i, j in zip([0] + cuts, cuts + [len(streamed)])]
+            stream = FakeStream(pieces + ["never read"])
+            agent.ollama_client = FakeClient(stream)
+
+            assert agent.chat_plan_json([]) == text
+            assert stream.closed
+            assert stream.consumed < len(stream.pieces)  # stopped before the end of the stream
+
+        # An unterminated object returns everything that was streamed
+        stream = FakeStream(['{"steps": [', '{"action"'])
+        agent.ollama_client = FakeClient(stream)
+        assert agent.chat_plan_json([]) == '{"steps": [{"action"'
+        assert stream.closed
+    finally:
+        agent.ollama_client = old_client
+
+    print("✅ chat_plan_json test passed")
+
+def git(repo, *args):
+    return subprocess.check_output(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=repo, text=True
+    ).strip()
+
+def test_read_git_head():
+    """Test: read_git_head matches git rev-parse for loose, packed and detached refs"""
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = Path(tmp)
+        worktree = repo / "worktree"
+        worktree.mkdir()
+        (worktree / ".git").write_text("gitdir: /elsewhere\n")
+        assert cli.read_git_head(worktree) is None  # left to the git subprocess fallback
+
+        git(repo, "init", "-q")
+        (repo / "sub").mkdir()
+        (repo / "sub" / "file.txt").write_text("one\n")
+        git(repo, "add", ".")
+        git(repo, "commit", "-q", "-m", "one")
+        first = git(repo, "rev-parse", "HEAD")
+        assert cli.read_git_head(repo) == first
+        assert cli.read_git_head(repo / "sub") == first  # found from a subdirectory
+
+        git(repo, "pack-refs", "--all")
+        (repo / "sub" / "file.txt").write_text("two\n")
+        git(repo, "commit", "-q", "-am", "two")
+        second = git(repo, "rev-parse", "HEAD")
+        assert cli.read_git_head(repo) == second  # loose ref shadows the packed one
+
+        git(repo, "pack-refs", "--all")
+        assert cli.read_git_head(repo) == second  # packed-refs only
+
+        git(repo, "checkout", "-q", first)
+        assert cli.read_git_head(repo) == first  # detached HEAD
+
+    print("✅ read_git_head test passed")
+
+def test_load_yaml_cached():
+    """Test: YAML policies round trip through the per-user JSON cache"""
+
+    old_cache_home = os.environ.get("XDG_CACHE_HOME")
+    try:
+        with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory() as cache_home:
+            os.environ["XDG_CACHE_HOME"] = cache_home
+            policy_file = os.path.join(tmp, "policy.yaml")
+            cache_file = policy.policy_cache_path(policy_file)
+            with open(policy_file, "w") as f:
+                f.write("codebase_auditor:\n  todo_density:\n    warn: 5\n    fail: 10\n")
+            engine = policy.PolicyEngine(policy_file)
+
+            # First load parses the YAML and writes the cache, outside the policy's directory
+            with open(policy_file) as f:
+                expected = yaml.safe_load(f)
+            assert os.path.exists(cache_file)
+            assert str(cache_file).startswith(cache_home)
+            assert os.listdir(tmp) == ["policy.yaml"]
+            assert engine.load_yaml_cached(policy_file) == expected
+
+            # Unchanged YAML is served from the cache
+            with open(cache_file) as f:
+                cached = json.load(f)
+            cached["policy"]["from_cache"] = True
+            with open(cache_file, "w") as f:
+                json.dump(cached, f)
+            assert engine.load_yaml_cached(policy_file)["from_cache"] is True
+
+            # A newer YAML file invalidates the cache
+            with open(policy_file, "w") as f:
+                f.write("repo_hygiene:\n  missing_readme: warn\n")
+            stat = os.stat(policy_file)
+            os.utime(policy_file, ns=(stat.st_atime_ns, cached["source_mtime_ns"] + 1))
+            assert engine.load_yaml_cached(policy_file) == {"repo_hygiene": {"missing_readme": "warn"}}
+
+            # A corrupt cache falls back to parsing the YAML
+            with open(cache_file, "w") as f:
+                f.write("{not json")
+            assert engine.load_yaml_cached(policy_file) == {"repo_hygiene": {"missing_readme": "warn"}}
+
+            # Values JSON can't represent (dates) are never cached
+            os.remove(cache_file)
+            with open(policy_file, "w") as f:
+                f.write("metadata:\n  released: 2024-01-01\n")
+            assert engine.load_yaml_cached(policy_file)["metadata"]["released"].year == 2024
+            assert not os.path.exists(cache_file)
+    finally:
+        if old_cache_home is None:
+            os.environ.pop("XDG_CACHE_HOME", None)
+        else:
+            os.environ["XDG_CACHE_HOME"] = old_cache_home
+
+    print("✅ load_yaml_cached test passed")
+
+def test_decision_cache():
+    """Test: cached policy decisions are copies and keyed on every input"""
+
+    with tempfile.TemporaryDirectory() as tmp:
+        policy_file = os.path.join(tmp, "policy.json")
+        with open(policy_file, "w") as f:
+            json.dump({"codebase_auditor": {"todo_density": {"warn": 1, "fail": 3}, "fixme_comments": "warn"}}, f)
+        engine = policy.PolicyEngine(policy_file, cache_decisions=True)
+        reference = policy.PolicyEngine(policy_file)
+        assert reference._decision_cache is None  # off by default
+
+        audit = {"mode": "codebase_auditor", "result": "TODO todo FIXME", "environment_facts": "a.py [text]"}
+        first = engine.evaluate(audit)
+        first_evidence = engine.evidence
+        assert first == reference.evaluate(audit)
+
+        # A hit returns equal results that the caller can't use to alter the cache
+        first[1][0]["message"] = "changed"
+        second = engine.evaluate(audit)
+        assert second == reference.evaluate(audit)
+        assert len(engine._decision_cache) == 1
+
+        # Mode, the file-marker offset and early_exit each get their own entry
+        variants = [
+            dict(audit, mode="repo_hygiene"),
+            {"mode": "codebase_auditor", "result": "TODO todo FIXME", "environment": {"current_directory": "a.py [text]"}},
+            audit,
+        ]
+        for i, variant in enumerate(variants):
+            early_exit = variant is audit
+            assert engine.evaluate(variant, early_exit=early_exit) == reference.evaluate(variant, early_exit=early_exit)
+            assert engine.evidence == reference.evidence
+            assert engine.files_inspected == reference.files_inspected
+            assert len(engine._decision_cache) == i + 2
+        assert engine.files_inspected == 1
+
+        # Evidence and files_inspected are restored from the cache on a hit
+        engine.evaluate(variants[1])
+        assert engine.files_inspected == 0
+        engine.evaluate(audit)
+        assert engine.evidence == first_evidence
+        assert engine.files_inspected == 1
+        assert len(engine._decision_cache) == 4
+
+        # Policies json can't canonicalize still load, they just aren't cached
+        with open(os.path.join(tmp, "mixed.yaml"), "w") as f:
+            f.write("codebase_auditor:\n  todo_density: warn\nyes: 1\n")
+        mixed = policy.PolicyEngine(os.path.join(tmp, "mixed.yaml"), cache_decisions=True)
+        assert mixed._decision_cache is None
+        assert mixed.evaluate(audit)[0] == 1
+
+    print("✅ decision cache test passed")
+
+def test_early_exit():
+    """Test: early_exit keeps the full evaluation's severity and truncates at the first failure"""
+
+    with tempfile.TemporaryDirectory() as tmp:
+        policy_file = os.path.join(tmp, "policy.json")
+        with open(policy_file, "w") as f:
+            json.dump({"ci_gate": {
+                "fixme_comments": "warn",
+                "secrets_detected": "fail",
+                "todo_density": {"warn": 1, "fail": 2},
+                "log_files": "warn",
+            }}, f)
+        engine = policy.PolicyEngine(policy_file)
+
+        audit = {"mode": "ci_gate", "result": "FIXME password TODO TODO app.log"}
+        full = engine.evaluate(audit)
+        full_evidence = engine.evidence
+        short = engine.evaluate(audit, early_exit=True)
+        assert full[0] == short[0] == 2
+        assert [v["rule"] for v in full[1]] == ["fixme_comments", "secrets_detected", "todo_density", "log_files"]
+        assert short[1] == full[1][:2]  # stops at secrets_detected
+        assert engine.evidence == full_evidence[:2]
+
+        # Without a failure nothing is cut short
+        audit = {"mode": "ci_gate", "result": "FIXME TODO app.log"}
+        assert engine.evaluate(audit, early_exit=True) == engine.evaluate(audit)
+
+    rng = random.Random(0)
+    words = "todo fixme password secret debug=true localhost .log dist/ import license readme [text] x".split()
+    engine = policy.PolicyEngine("policy.yaml")
+    for _ in range(500):
+        audit = {"mode": rng.choice(list(engine.rule_plans)), "result": " ".join(rng.choices(words, k=rng.randint(0, 60)))}
+        severity, violations = engine.evaluate(audit)
+        evidence = engine.evidence
+        short_severity, short_violations = engine.evaluate(audit, early_exit=True)
+        assert short_severity == severity
+        assert short_violations == violations[:len(short_violations)]
+        assert engine.evidence == evidence[:len(engine.evidence)]
+        if severity == 2:
+            assert engine.evidence[-1]["severity"] == "critical"
+
+    print("✅ early_exit test passed")
+
+def reference_rule(rule_name, rule_config, combined_text):
+    """The original PolicyEngine.evaluate_rule if-chain over lowercased str text"""
+    def code(severity):
+        return {"fail": 2, "warn": 1}.get(severity, 0) if isinstance(severity, str) else 0
+
+    if rule_name == "missing_license":
+        if any(i in combined_text for i in ["license", "licence", "copying", "copyright"]):
+            return 0, ""
+        return code(rule_config), "LICENSE file not found"
+    elif rule_name == "missing_readme":
+        if any(i in combined_text for i in ["readme", "read_me", "readme.md", "readme.txt"]):
+            return 0, ""
+        return code(rule_config), "README file not found"
+    elif rule_name == "todo_density":
+        todo_count = combined_text.count("todo")
+        if isinstance(rule_config, dict):
+            if todo_count >= rule_config.get("fail", 999):
+                return 2, f"TODO count too high: {todo_count} (max: {rule_config['fail']})"
+            elif todo_count >= rule_config.get("warn", 999):
+                return 1, f"High TODO count: {todo_count} (threshold: {rule_config['warn']})"
+        elif todo_count > 0:
+            return code(rule_config), f"TODOs found: {todo_count}"
+    elif rule_name == "fixme_comments":
+        if "fixme" in combined_text:
+            return code(rule_config), f"FIXME comments found: {combined_text.count('fixme')}"
+    elif rule_name == "secrets_detected":
+        for indicator in ["password", "secret", "key", "token", "api_key"]:
+            if indicator in combined_text:
+                return code(rule_config), f"Potential secret detected: {indicator}"
+    elif rule_name == "debug_flags":
+        for indicator in ["debug=true", "debug: true", "debug_mode"]:
+            if indicator in combined_text:
+                return code(rule_config), f"Debug flag detected: {indicator}"
+    elif rule_name == "localhost_references":
+        if "localhost" in combined_text or "127.0.0.1" in combined_text:
+            return code(rule_config), "Localhost references found"
+    elif rule_name == "log_files":
+        if ".log" in combined_text:
+            return code(rule_config), "Log files detected in repository"
+    elif rule_name == "build_artifacts":
+        for artifact in [".class", ".tmp", ".cache", "node_modules", "__pycache__"]:
+            if artifact in combined_text:
+                return code(rule_config), f"Build artifact detected: {artifact}"
+    elif rule_name == "import_count":
+        import_count = combined_text.count("import")
+        if isinstance(rule_config, dict):
+            if import_count >= rule_config.get("fail", 999):
+                return 2, f"Import count too high: {import_count} (max: {rule_config['fail']})"
+            elif import_count >= rule_config.get("warn", 999):
+                return 1, f"High import count: {import_count} (threshold: {rule_config['warn']})"
+    return 0, ""
+
+def reference_evaluate(engine, audit_result):
+    """The original PolicyEngine.evaluate loop, returning (severity, violations, evidence)"""
+    mode = audit_result.get("specialization", audit_result.get("mode", "codebase_auditor"))
+    if mode not in engine.policy:
+        return 0, [f"No policy defined for mode: {mode}"], None
+
+    env_facts = audit_result.get("environment_facts", "")
+    if not env_facts and "environment" in audit_result:
+        env_facts = audit_result["environment"].get("current_directory", "")
+    combined_text = (audit_result.get("result", "").lower() + " " + env_facts).lower()
+
+    names = ["info", "warning", "critical"]
+    violations, evidence, max_severity = [], [], 0
+    for rule_name, rule_config in engine.policy[mode].items():
+        severity, message = reference_rule(rule_name, rule_config, combined_text)
+        evidence.append({"rule": rule_name, "checked": True, "passed": severity == 0,
+                         "severity": names[min(severity, 2)]})
+        if message:
+            violations.append({"rule": rule_name, "message": message,
+                               "category": engine.get_rule_category(rule_name), "severity": names[min(severity, 2)]})
+        max_severity = max(max_severity, severity)
+    return max_severity, violations, evidence
+
+def test_policy_matches_reference():
+    """Test: PolicyEngine.evaluate matches the original rule-by-rule evaluation"""
+
+    rng = random.Random(0)
+    tokens = ["license", "COPYING", "readme", "todo", "TODO", "fixme", "password", "api_key", "token",
+              "debug", "=true", ": true", "debug_mode", "localhost", "127.0.0.1", ".log", ".class",
+              "__pycache__", "node_modules", "import", "[text]", "[dir]", " ", "\n", "x", "✅", "Ä"]
+    policy_files = ["policy.yaml"] + [os.path.join("policy-packs", name)
+                                      for name in sorted(os.listdir("policy-packs")) if name.endswith(".yaml")]
+    for policy_file in policy_files:
+        engine = policy.PolicyEngine(policy_file)
+        modes = list(engine.rule_plans) + ["unknown_mode"]
+        for _ in range(1000):
+            audit = {"mode": rng.choice(modes), "result": "".join(rng.choices(tokens, k=rng.randint(0, 15)))}
+            facts = "".join(rng.choices(tokens, k=rng.randint(0, 8)))
+            if rng.random() < 0.7:
+                audit["environment_facts"] = facts
+            else:
+                audit["environment"] = {"current_directory": facts}
+
+            severity, violations, evidence = reference_evaluate(engine, audit)
+            assert engine.evaluate(audit) == (severity, violations), (policy_file, audit)
+            if evidence is not None:
+                assert engine.evidence == evidence, (policy_file, audit)
+
+    print("✅ policy reference equivalence test passed")
+
+if __name__ == "__main__":
+    print("Running behavior tests...\n")
+
+    test_search_file_line_numbers()
+    test_search_file_skips_empty_and_large()
+    test_ripgrep_matches_fallback()
+    test_classify_sqlite_sidecars()
+    test_fast_parse_args()
+    test_chat_plan_json()
+    test_read_git_head()
+    test_load_yaml_cached()
+    test_decision_cache()
+    test_early_exit()
+    test_policy_matches_reference()
+
+    print("\n🎉 All behavior tests passed!")